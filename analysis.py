@@ -1,113 +1,189 @@
+import json
+import os
 import pandas as pd
 import numpy as np
+import numexpr as ne
+import pyarrow as pa
+import pyarrow.parquet as pq
 import matplotlib.pyplot as plt
 import seaborn as sns
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
-from sklearn.cluster import KMeans
+from sklearn.cluster import MiniBatchKMeans
 from sklearn.preprocessing import StandardScaler
 from sklearn.decomposition import PCA
 import warnings
 warnings.filterwarnings('ignore')
 
+# Saved with every snapshot; bump it whenever _prepare_data changes so that
+# snapshots written by older code are rebuilt instead of reused
+SNAPSHOT_VERSION = 1
+
 class ShortformAnalyzer:
-    def __init__(self, videos_df, creators_df, platforms_df):
+    def __init__(self, videos_df, creators_df, platforms_df, merged_df=None):
         self.videos = videos_df
         self.creators = creators_df
         self.platforms = platforms_df
-        self.merged = None
-        self._prepare_data()
+        self.merged = merged_df
+        
+        # Cached aggregates, computed on first use
+        self._format_stats = None
+        self._creator_stats = None
+        self._niche_stats = None
+        self._duration_stats = None
+        self._correlation_matrix = None
+        
+        if self.merged is None:
+            self._prepare_data()
+        else:
+            creators = self.merged.drop_duplicates('creator_name')
+            self._followers = dict(zip(creators['creator_name'], creators['followers']))
+    
+    @classmethod
+    def from_snapshot(cls, path):
+        """Create an analyzer from a dataset saved with snapshot()"""
+        merged = pd.read_parquet(path, engine='pyarrow')
+        return cls(None, None, None, merged_df=merged)
+    
+    @staticmethod
+    def read_snapshot_metadata(path):
+        """Return the metadata saved with a snapshot, including its version"""
+        metadata = pq.read_schema(path).metadata or {}
+        return json.loads(metadata.get(b'shortform_signals', b'{}'))
+    
+    def snapshot(self, path, metadata=None):
+        """Save the prepared dataset to Parquet so later runs can skip preparation"""
+        table = pa.Table.from_pandas(self.merged, preserve_index=False)
+        info = {'version': SNAPSHOT_VERSION, **(metadata or {})}
+        table = table.replace_schema_metadata({
+            **table.schema.metadata,
+            b'shortform_signals': json.dumps(info, default=float).encode()
+        })
+        
+        # Write beside the target and swap it in, so an interrupted run never
+        # leaves a truncated snapshot behind
+        tmp_path = f"{path}.tmp"
+        try:
+            pq.write_table(table, tmp_path, compression='zstd')
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
     
     def _prepare_data(self):
         """Prepare merged dataset for analysis"""
-        # Merge videos with creators
-        self.merged = self.videos.merge(self.creators, on='creator_id', how='left')
+        # Merge videos with creators on a shared categorical key so the join
+        # hashes integer codes rather than strings
+        creator_ids = pd.CategoricalDtype(
+            pd.Index(self.creators['creator_id']).union(pd.Index(self.videos['creator_id']).unique())
+        )
+        videos = self.videos.astype({'creator_id': creator_ids})
+        creators = self.creators.astype({'creator_id': creator_ids})
+        self.merged = videos.merge(creators, on='creator_id', how='left', validate='many_to_one')
+        
+        # Only the follower counts are needed after the merge
+        self._followers = dict(zip(self.creators['creator_name'], self.creators['followers']))
+        self.creators = None
         
-        # Calculate additional metrics
-        self.merged['engagement_rate'] = (
-            (self.merged['likes'] + self.merged['comments'] + self.merged['shares']) / 
-            self.merged['views']
-        ) * 100
+        # Calculate additional metrics, dividing by views only once
+        inv_views = np.reciprocal(self.merged['views'].to_numpy(dtype=np.float64))
+        likes = self.merged['likes'].to_numpy(dtype=np.float64)
+        comments = self.merged['comments'].to_numpy(dtype=np.float64)
+        shares = self.merged['shares'].to_numpy(dtype=np.float64)
         
-        self.merged['avg_watch_time_per_view'] = self.merged['watch_time'] / self.merged['views']
-        self.merged['like_to_view_ratio'] = self.merged['likes'] / self.merged['views']
-        self.merged['share_to_view_ratio'] = self.merged['shares'] / self.merged['views']
+        metrics = {
+            'engagement_rate': ne.evaluate("(likes + comments + shares) * inv_views * 100"),
+            'avg_watch_time_per_view': self.merged['watch_time'].to_numpy(dtype=np.float64) * inv_views,
+            'like_to_view_ratio': likes * inv_views,
+            'share_to_view_ratio': shares * inv_views
+        }
         
         # Calculate retention rate if not present
         if 'retention_rate' not in self.merged.columns:
-            self.merged['retention_rate'] = self.merged['full_views'] / self.merged['views']
+            metrics['retention_rate'] = self.merged['full_views'].to_numpy(dtype=np.float64) * inv_views
+        
+        # Create duration bins
+        metrics['duration_bin'] = pd.cut(
+            self.merged['duration_sec'], 
+            bins=[0, 15, 30, 45, 60, 100], 
+            labels=['0-15s', '15-30s', '30-45s', '45-60s', '60s+']
+        )
+        
+        self.merged = self.merged.assign(**metrics)
+    
+    def _format_aggregates(self):
+        """Unrounded per-format statistics, computed once"""
+        if self._format_stats is None:
+            self._format_stats = self.merged.groupby('format_type', observed=True).agg({
+                'views': ['mean', 'std'],
+                'likes': ['mean', 'std'],
+                'comments': ['mean', 'std'],
+                'shares': ['mean', 'std'],
+                'retention_rate': ['mean', 'std'],
+                'engagement_rate': ['mean', 'std'],
+                'hook_watch_rate': ['mean', 'std']
+            })
+        return self._format_stats
     
     def format_performance_analysis(self):
         """Analyze performance by content format"""
-        format_stats = self.merged.groupby('format_type').agg({
-            'views': ['mean', 'std'],
-            'likes': ['mean', 'std'],
-            'comments': ['mean', 'std'],
-            'shares': ['mean', 'std'],
-            'retention_rate': ['mean', 'std'],
-            'engagement_rate': ['mean', 'std'],
-            'hook_watch_rate': ['mean', 'std']
-        }).round(2)
-        
-        return format_stats
+        return self._format_aggregates().round(2)
     
     def creator_performance_ranking(self, top_n=10):
         """Rank creators by various performance metrics"""
-        creator_stats = self.merged.groupby(['creator_name', 'niche']).agg({
-            'views': 'mean',
-            'likes': 'mean',
-            'shares': 'mean',
-            'retention_rate': 'mean',
-            'engagement_rate': 'mean',
-            'hook_watch_rate': 'mean'
-        }).round(3)
+        if self._creator_stats is not None:
+            return self._creator_stats.head(top_n)
+        
+        creator_stats = self.merged.groupby(['creator_name', 'niche'], sort=False, observed=True)[
+            ['views', 'likes', 'shares', 'retention_rate', 'engagement_rate', 'hook_watch_rate']
+        ].mean().round(3)
         
         # Add follower count
-        creator_stats = creator_stats.merge(
-            self.creators[['creator_name', 'followers']], 
-            on='creator_name', 
-            how='left'
+        creator_stats['followers'] = (
+            creator_stats.index.get_level_values('creator_name').map(self._followers).to_numpy()
         )
         
-        return creator_stats.sort_values('retention_rate', ascending=False).head(top_n)
+        self._creator_stats = creator_stats.sort_values('retention_rate', ascending=False)
+        return self._creator_stats.head(top_n)
+    
+    def _niche_aggregates(self):
+        """Unrounded per-niche statistics, computed once"""
+        if self._niche_stats is None:
+            grouped = self.merged.groupby('niche', observed=True)
+            
+            # Flat column names for easier access
+            niche_stats = grouped[
+                ['views', 'likes', 'shares', 'retention_rate', 'engagement_rate', 'hook_watch_rate']
+            ].mean().add_suffix('_mean')
+            niche_stats.insert(1, 'views_count', grouped['views'].count())
+            self._niche_stats = niche_stats
+        return self._niche_stats
     
     def niche_analysis(self):
         """Analyze performance by creator niche"""
-        niche_stats = self.merged.groupby('niche').agg({
-            'views': ['mean', 'count'],
-            'likes': 'mean',
-            'shares': 'mean',
-            'retention_rate': 'mean',
-            'engagement_rate': 'mean',
-            'hook_watch_rate': 'mean'
-        }).round(3)
-        
-        # Flatten column names for easier access
-        niche_stats.columns = ['_'.join(col).strip() for col in niche_stats.columns.values]
-        
-        return niche_stats
+        return self._niche_aggregates().round(3)
+    
+    def _duration_aggregates(self):
+        """Per-duration-bin statistics, computed once"""
+        if self._duration_stats is None:
+            self._duration_stats = self.merged.groupby('duration_bin', observed=True).agg({
+                'views': 'mean',
+                'retention_rate': 'mean',
+                'engagement_rate': 'mean',
+                'hook_watch_rate': 'mean'
+            }).round(3)
+        return self._duration_stats
     
     def duration_analysis(self):
         """Analyze the relationship between video duration and performance"""
-        # Create duration bins
-        self.merged['duration_bin'] = pd.cut(
-            self.merged['duration_sec'], 
-            bins=[0, 15, 30, 45, 60, 100], 
-            labels=['0-15s', '15-30s', '30-45s', '45-60s', '60s+']
-        )
-        
-        duration_stats = self.merged.groupby('duration_bin').agg({
-            'views': 'mean',
-            'retention_rate': 'mean',
-            'engagement_rate': 'mean',
-            'hook_watch_rate': 'mean'
-        }).round(3)
-        
-        return duration_stats
+        return self._duration_aggregates().copy()
     
-    def correlation_analysis(self):
-        """Analyze correlations between different metrics"""
+    def _correlation_aggregates(self):
+        """Correlation matrix of the performance metrics, computed once"""
+        if self._correlation_matrix is not None:
+            return self._correlation_matrix
+        
         numeric_cols = [
             'views', 'likes', 'comments', 'shares', 'watch_time', 
             'full_views', 'retention_rate', 'hook_watch_rate',
@@ -115,9 +191,23 @@ class ShortformAnalyzer:
             'like_to_view_ratio', 'share_to_view_ratio'
         ]
         
-        correlation_matrix = self.merged[numeric_cols].corr()
+        values = self.merged[numeric_cols].to_numpy(dtype=np.float64)
+        if np.isfinite(values).all():
+            # One covariance product over the whole matrix
+            corr = np.corrcoef(values, rowvar=False)
+            np.fill_diagonal(corr, 1.0)
+            correlation_matrix = pd.DataFrame(corr, index=numeric_cols, columns=numeric_cols)
+        else:
+            # Missing or infinite values need pandas' pairwise handling
+            correlation_matrix = self.merged[numeric_cols].corr()
+        
+        self._correlation_matrix = correlation_matrix
         return correlation_matrix
     
+    def correlation_analysis(self):
+        """Analyze correlations between different metrics"""
+        return self._correlation_aggregates().copy()
+    
     def performance_clustering(self, n_clusters=4):
         """Cluster videos based on performance metrics"""
         # Select features for clustering
@@ -128,7 +218,7 @@ class ShortformAnalyzer:
         scaled_features = scaler.fit_transform(self.merged[features])
         
         # Perform clustering
-        kmeans = KMeans(n_clusters=n_clusters, random_state=42)
+        kmeans = MiniBatchKMeans(n_clusters=n_clusters, batch_size=4096, n_init=3, random_state=42)
         self.merged['cluster'] = kmeans.fit_predict(scaled_features)
         
         # Analyze clusters
@@ -139,7 +229,29 @@ class ShortformAnalyzer:
     
     def top_performers_analysis(self, metric='retention_rate', top_n=20):
         """Analyze top performing videos"""
-        top_videos = self.merged.nlargest(top_n, metric)[
+        values = self.merged[metric].to_numpy(dtype=np.float64)
+        top_idx = np.flatnonzero(~np.isnan(values))
+        
+        # Find the top rows in linear time, then sort only those
+        if top_n <= 0:
+            top_idx = top_idx[:0]
+        elif top_n < len(top_idx):
+            candidates = values[top_idx]
+            kth = np.partition(candidates, len(candidates) - top_n)[len(candidates) - top_n]
+            above = top_idx[candidates > kth]
+            # Ties at the cutoff go to the earliest rows, as nlargest does
+            tied = top_idx[candidates == kth][:top_n - len(above)]
+            top_idx = np.concatenate([above, tied])
+        top_idx = top_idx[np.lexsort((top_idx, -values[top_idx]))]
+        
+        # Like nlargest, fill any remaining slots with the rows missing the metric
+        if len(top_idx) < top_n:
+            missing = np.flatnonzero(np.isnan(values))[:top_n - len(top_idx)]
+            top_idx = np.concatenate([top_idx, missing])
+        
+        # Select rows and columns together so only the reported columns are copied
+        top_videos = self.merged.loc[
+            self.merged.index[top_idx],
             ['video_id', 'creator_name', 'format_type', 'duration_sec', 
              'views', 'likes', 'shares', 'retention_rate', 'engagement_rate', 
              'hook_watch_rate', 'niche']
@@ -155,21 +267,21 @@ class ShortformAnalyzer:
         fig.suptitle('Shortform Video Performance Analysis', fontsize=16, fontweight='bold')
         
         # 1. Format Performance
-        format_means = self.merged.groupby('format_type')['retention_rate'].mean().sort_values(ascending=False)
+        format_means = self._format_aggregates()['retention_rate']['mean'].sort_values(ascending=False)
         axes[0, 0].bar(format_means.index, format_means.values, color='skyblue')
         axes[0, 0].set_title('Average Retention Rate by Format')
         axes[0, 0].set_ylabel('Retention Rate')
         axes[0, 0].tick_params(axis='x', rotation=45)
         
         # 2. Niche Performance
-        niche_means = self.merged.groupby('niche')['engagement_rate'].mean().sort_values(ascending=False)
+        niche_means = self._niche_aggregates()['engagement_rate_mean'].sort_values(ascending=False)
         axes[0, 1].bar(niche_means.index, niche_means.values, color='lightcoral')
         axes[0, 1].set_title('Average Engagement Rate by Niche')
         axes[0, 1].set_ylabel('Engagement Rate (%)')
         axes[0, 1].tick_params(axis='x', rotation=45)
         
         # 3. Duration vs Retention
-        duration_stats = self.duration_analysis()
+        duration_stats = self._duration_aggregates()
         if not duration_stats.empty and 'retention_rate' in duration_stats.columns:
             axes[0, 2].plot(duration_stats.index, duration_stats['retention_rate'], 
                            marker='o', color='green', linewidth=2)
@@ -181,8 +293,11 @@ class ShortformAnalyzer:
                            ha='center', va='center', transform=axes[0, 2].transAxes)
             axes[0, 2].set_title('Retention Rate by Duration')
         
-        # 4. Views vs Engagement
-        axes[1, 0].scatter(self.merged['views'], self.merged['engagement_rate'], 
+        # 4. Views vs Engagement (sampled on large datasets)
+        points = self.merged
+        if len(points) > 10000:
+            points = points.sample(10000, random_state=0)
+        axes[1, 0].scatter(points['views'], points['engagement_rate'], 
                           alpha=0.6, color='purple')
         axes[1, 0].set_title('Views vs Engagement Rate')
         axes[1, 0].set_xlabel('Views')
@@ -195,7 +310,7 @@ class ShortformAnalyzer:
         axes[1, 1].set_ylabel('Frequency')
         
         # 6. Correlation Heatmap
-        corr_matrix = self.correlation_analysis()
+        corr_matrix = self._correlation_aggregates()
         sns.heatmap(corr_matrix, annot=True, cmap='coolwarm', center=0, 
                    ax=axes[1, 2], fmt='.2f')
         axes[1, 2].set_title('Metric Correlations')
@@ -215,7 +330,7 @@ class ShortformAnalyzer:
         # Creator insights
         top_creators = self.creator_performance_ranking(5)
         if len(top_creators) > 0:
-            top_creator_name = top_creators.index[0] if isinstance(top_creators.index[0], str) else str(top_creators.index[0])
+            top_creator_name = str(top_creators.index.get_level_values('creator_name')[0])
             insights.append(f" **Top Creator**: {top_creator_name} leads in retention rate")
         else:
             insights.append(" **Top Creator**: Analysis available in detailed report")
@@ -226,7 +341,7 @@ class ShortformAnalyzer:
         insights.append(f" **Most Engaging Niche**: {best_niche} generates highest engagement rates")
         
         # Duration insights
-        duration_stats = self.duration_analysis()
+        duration_stats = self._duration_aggregates()
         if not duration_stats.empty and 'retention_rate' in duration_stats.columns:
             optimal_duration = duration_stats['retention_rate'].idxmax()
             insights.append(f" **Optimal Duration**: {optimal_duration} videos perform best")
@@ -234,7 +349,7 @@ class ShortformAnalyzer:
             insights.append(" **Duration Analysis**: Available in detailed report")
         
         # Correlation insights
-        corr_matrix = self.correlation_analysis()
+        corr_matrix = self._correlation_aggregates()
         highest_corr = corr_matrix.unstack().sort_values(ascending=False)
         if len(highest_corr) > 2:
             insights.append(f" **Strongest Correlation**: {highest_corr.index[1]} and {highest_corr.index[2]}")
@@ -18,5 +18,9 @@ VIDEOS_FILE = os.path.join(SCRIPT_DIR, "shortform_videos.csv")
 CREATORS_FILE = os.path.join(SCRIPT_DIR, "shortform_creators.csv")
 PLATFORMS_FILE = os.path.join(SCRIPT_DIR, "shortform_platforms.csv")
 
+# Prepared analysis data, rebuilt when the source CSVs change or the
+# snapshot format version in analysis.py is bumped
+SNAPSHOT_FILE = os.path.join(SCRIPT_DIR, "merged.parquet")
+
 # Database Connection String
 DB_URL = f"postgresql://{DB_CONFIG['user']}:{DB_CONFIG['password']}@{DB_CONFIG['host']}:{DB_CONFIG['port']}/{DB_CONFIG['database']}" 
\ No newline at end of file
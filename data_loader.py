@@ -1,16 +1,73 @@
 import pandas as pd
 import numpy as np
-from sqlalchemy import create_engine, text
+import numexpr as ne
+import pyarrow as pa
+import adbc_driver_postgresql.dbapi as adbc_postgresql
 from config import DB_URL, VIDEOS_FILE, CREATORS_FILE, PLATFORMS_FILE
 import logging
+from concurrent.futures import ThreadPoolExecutor
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Columns used by validation, analysis and the database tables; platform is
+# the key that joins videos to shortform_platforms
+VIDEO_COLUMNS = [
+    'video_id', 'creator_id', 'format_type', 'duration_sec', 'views', 'likes',
+    'comments', 'shares', 'watch_time', 'full_views', 'hook_watch_rate', 'platform'
+]
+
+# Read only when the file provides them
+VIDEO_OPTIONAL_COLUMNS = ['retention_rate']
+
+CREATOR_COLUMNS = ['creator_id', 'creator_name', 'niche', 'followers']
+
+# Category keys make groupbys on the string columns run on integer codes
+# instead of Python objects
+VIDEO_DTYPES = {
+    'format_type': 'category'
+}
+
+CREATOR_DTYPES = {
+    'creator_name': 'category',
+    'niche': 'category'
+}
+
+# Integer metrics narrowed by downcast_metrics() once they have been validated
+VIDEO_INT_COLUMNS = ['duration_sec', 'views', 'likes', 'comments', 'shares', 'watch_time', 'full_views']
+CREATOR_INT_COLUMNS = ['followers']
+
+def table_type(arrow_type):
+    """Map an Arrow column type to the type stored in PostgreSQL"""
+    if pa.types.is_dictionary(arrow_type):
+        return arrow_type.value_type
+    if pa.types.is_integer(arrow_type) and arrow_type.bit_width < 32:
+        return pa.int32()
+    if pa.types.is_unsigned_integer(arrow_type):
+        return pa.int64()
+    return arrow_type
+
+def ingest_df(cursor, df, table):
+    """Bulk load a DataFrame into PostgreSQL through Arrow and binary COPY"""
+    data = pa.Table.from_pandas(df, preserve_index=False)
+    
+    # Send category columns as their plain values, and widen downcast integers
+    # back to the INT/BIGINT columns of the table schema
+    data = data.cast(pa.schema([
+        field.with_type(table_type(field.type)) for field in data.schema
+    ]))
+    
+    cursor.adbc_ingest(table, data, mode="replace")
+
+def select_columns(path, columns, optional_columns=()):
+    """Return the columns to parse, adding the optional ones present in the file header"""
+    header = pd.read_csv(path, nrows=0).columns
+    return columns + [col for col in optional_columns if col in header]
+
 class ShortformDataLoader:
     def __init__(self):
-        self.engine = None
+        self.connection = None
         self.videos = None
         self.creators = None
         self.platforms = None
@@ -18,29 +75,47 @@ class ShortformDataLoader:
     def connect_database(self):
         """Establish database connection with error handling"""
         try:
-            self.engine = create_engine(DB_URL)
+            self.connection = adbc_postgresql.connect(DB_URL)
             # Test connection
-            with self.engine.connect() as conn:
-                conn.execute(text("SELECT 1"))
+            with self.connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+                cursor.fetchone()
             logger.info(" Database connection established successfully")
             return True
         except Exception as e:
             logger.error(f" Database connection failed: {e}")
+            self.close_database()
             return False
     
+    def close_database(self):
+        """Close the database connection if one is open"""
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+    
     def load_csv_data(self):
         """Load CSV files with validation"""
         try:
+            video_columns = select_columns(VIDEOS_FILE, VIDEO_COLUMNS, VIDEO_OPTIONAL_COLUMNS)
+            
+            # Read the files concurrently; parsing runs outside the GIL
+            with ThreadPoolExecutor(max_workers=3) as executor:
+                videos = executor.submit(pd.read_csv, VIDEOS_FILE, usecols=video_columns,
+                                         dtype=VIDEO_DTYPES, engine="pyarrow")
+                creators = executor.submit(pd.read_csv, CREATORS_FILE, usecols=CREATOR_COLUMNS,
+                                           dtype=CREATOR_DTYPES, engine="pyarrow")
+                platforms = executor.submit(pd.read_csv, PLATFORMS_FILE, engine="pyarrow")
+            
             # Load videos data
-            self.videos = pd.read_csv(VIDEOS_FILE)
+            self.videos = videos.result()
             logger.info(f" Loaded {len(self.videos)} video records")
             
             # Load creators data
-            self.creators = pd.read_csv(CREATORS_FILE)
+            self.creators = creators.result()
             logger.info(f" Loaded {len(self.creators)} creator records")
             
             # Load platforms data
-            self.platforms = pd.read_csv(PLATFORMS_FILE)
+            self.platforms = platforms.result()
             logger.info(f" Loaded {len(self.platforms)} platform records")
             
             return True
@@ -70,10 +145,11 @@ class ShortformDataLoader:
             if (self.videos['retention_rate'] > 1).any():
                 issues.append("Invalid retention rates > 100% found")
         
-        # Check for negative values in metrics
+        # Check for negative values in metrics with one sweep over all columns
         numeric_cols = ['views', 'likes', 'comments', 'shares', 'watch_time', 'full_views']
-        for col in numeric_cols:
-            if (self.videos[col] < 0).any():
+        negative = (self.videos[numeric_cols].to_numpy() < 0).any(axis=0)
+        for col, has_negative in zip(numeric_cols, negative):
+            if has_negative:
                 issues.append(f"Negative values found in {col}")
         
         if issues:
@@ -87,39 +163,55 @@ class ShortformDataLoader:
     
     def calculate_derived_metrics(self):
         """Calculate additional metrics for analysis"""
-        # Engagement rate
-        self.videos['engagement_rate'] = (
-            (self.videos['likes'] + self.videos['comments'] + self.videos['shares']) / 
-            self.videos['views']
-        ) * 100
+        # Divide by views once and reuse the reciprocal for every ratio
+        inv_views = np.reciprocal(self.videos['views'].to_numpy(dtype=np.float64))
+        likes = self.videos['likes'].to_numpy(dtype=np.float64)
+        comments = self.videos['comments'].to_numpy(dtype=np.float64)
+        shares = self.videos['shares'].to_numpy(dtype=np.float64)
         
-        # Average watch time per view
-        self.videos['avg_watch_time_per_view'] = self.videos['watch_time'] / self.videos['views']
-        
-        # Like-to-view ratio
-        self.videos['like_to_view_ratio'] = self.videos['likes'] / self.videos['views']
-        
-        # Share-to-view ratio
-        self.videos['share_to_view_ratio'] = self.videos['shares'] / self.videos['views']
+        self.videos = self.videos.assign(
+            # Engagement rate, fused into a single pass without temporaries
+            engagement_rate=ne.evaluate("(likes + comments + shares) * inv_views * 100"),
+            # Average watch time per view
+            avg_watch_time_per_view=self.videos['watch_time'].to_numpy(dtype=np.float64) * inv_views,
+            # Like-to-view ratio
+            like_to_view_ratio=likes * inv_views,
+            # Share-to-view ratio
+            share_to_view_ratio=shares * inv_views
+        )
         
         logger.info(" Derived metrics calculated")
     
+    def downcast_metrics(self):
+        """Shrink integer metric columns to the narrowest type that holds their values"""
+        # to_numeric checks the value range, so large counts keep a wide type,
+        # and columns holding missing values stay float
+        for df, columns in [(self.videos, VIDEO_INT_COLUMNS), (self.creators, CREATOR_INT_COLUMNS)]:
+            for col in columns:
+                df[col] = pd.to_numeric(df[col], downcast='integer')
+    
     def load_to_database(self):
         """Load data to PostgreSQL database"""
-        if not self.engine:
+        if not self.connection:
             logger.error(" No database connection available")
             return False
         
         try:
-            # Load to database
-            self.videos.to_sql("shortform_videos", self.engine, if_exists="replace", index=False)
-            self.creators.to_sql("shortform_creators", self.engine, if_exists="replace", index=False)
-            self.platforms.to_sql("shortform_platforms", self.engine, if_exists="replace", index=False)
+            # Replace all three tables in a single transaction
+            with self.connection.cursor() as cursor:
+                ingest_df(cursor, self.videos, "shortform_videos")
+                ingest_df(cursor, self.creators, "shortform_creators")
+                ingest_df(cursor, self.platforms, "shortform_platforms")
+            self.connection.commit()
             
             logger.info(" Data loaded successfully into PostgreSQL")
             return True
         except Exception as e:
             logger.error(f" Error loading to database: {e}")
+            try:
+                self.connection.rollback()
+            except Exception as rollback_error:
+                logger.error(f" Error rolling back database load: {rollback_error}")
             return False
     
     def get_data_summary(self):
@@ -153,6 +245,8 @@ def main():
     if not loader.validate_data():
         logger.warning(" Proceeding with validation issues...")
     
+    loader.downcast_metrics()
+    
     # Calculate derived metrics
     loader.calculate_derived_metrics()
     
@@ -160,6 +254,7 @@ def main():
     if loader.connect_database():
         # Load to database
         loader.load_to_database()
+        loader.close_database()
     
     # Print summary
     summary = loader.get_data_summary()
@@ -9,52 +9,88 @@ validation, analysis, and visualization generation.
 import sys
 import os
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 
 # Add the project root to the Python path
 project_root = Path(__file__).parent
 sys.path.append(str(project_root))
 
 from data_loader import ShortformDataLoader
-from analysis import ShortformAnalyzer
+from analysis import ShortformAnalyzer, SNAPSHOT_VERSION
+from config import VIDEOS_FILE, CREATORS_FILE, PLATFORMS_FILE, SNAPSHOT_FILE
 import matplotlib.pyplot as plt
 
+def snapshot_is_current():
+    """Check whether the prepared data snapshot matches this code and its source CSVs"""
+    snapshot = Path(SNAPSHOT_FILE)
+    if not snapshot.exists():
+        return False
+    
+    # Unreadable snapshots, or ones saved without the run summary, are rebuilt
+    try:
+        metadata = ShortformAnalyzer.read_snapshot_metadata(SNAPSHOT_FILE)
+    except Exception:
+        return False
+    if metadata.get('version') != SNAPSHOT_VERSION or 'summary' not in metadata:
+        return False
+    
+    source_mtime = max(Path(f).stat().st_mtime for f in (VIDEOS_FILE, CREATORS_FILE, PLATFORMS_FILE))
+    return snapshot.stat().st_mtime > source_mtime
+
+def prepare_source_data(loader):
+    """Load and validate the source CSVs and calculate derived metrics"""
+    if not loader.load_csv_data():
+        return False
+    
+    if not loader.validate_data():
+        print(" Data validation issues found, but continuing...")
+    
+    loader.downcast_metrics()
+    loader.calculate_derived_metrics()
+    return True
+
 def main():
     """Run the complete analysis pipeline"""
     print("🚀 Starting Shortform Signals Analysis")
     print("=" * 50)
     
-    # Step 1: Load and validate data
-    print("\n📊 Step 1: Loading and validating data...")
     loader = ShortformDataLoader()
     
-    if not loader.load_csv_data():
-        print(" Failed to load data. Exiting.")
-        return
-    
-    if not loader.validate_data():
-        print(" Data validation issues found, but continuing...")
-    
-    loader.calculate_derived_metrics()
+    # Step 1: Load and validate data, unless a current snapshot can be reused
+    if snapshot_is_current():
+        print("\n📊 Step 1: Loading prepared data from 'merged.parquet'...")
+        analyzer = ShortformAnalyzer.from_snapshot(SNAPSHOT_FILE)
+        summary = ShortformAnalyzer.read_snapshot_metadata(SNAPSHOT_FILE)['summary']
+    else:
+        print("\n📊 Step 1: Loading and validating data...")
+        if not prepare_source_data(loader):
+            print(" Failed to load data. Exiting.")
+            return
+        
+        analyzer = ShortformAnalyzer(loader.videos, loader.creators, loader.platforms)
+        summary = loader.get_data_summary()
+        analyzer.snapshot(SNAPSHOT_FILE, {'summary': summary})
     
     # Step 2: Run analysis
     print("\n Step 2: Running comprehensive analysis...")
-    analyzer = ShortformAnalyzer(loader.videos, loader.creators, loader.platforms)
-    
-    # Generate reports
-    print("\n Format Performance:")
-    print(analyzer.format_performance_analysis())
-    
-    print("\n Top Creators:")
-    print(analyzer.creator_performance_ranking(10))
-    
-    print("\n Niche Analysis:")
-    print(analyzer.niche_analysis())
-    
-    print("\n Duration Analysis:")
-    print(analyzer.duration_analysis())
     
-    print("\n Top Performing Videos:")
-    print(analyzer.top_performers_analysis('retention_rate', 10))
+    # Generate reports concurrently; each one only reads the merged data
+    reports = {
+        'Format Performance': analyzer.format_performance_analysis,
+        'Top Creators': lambda: analyzer.creator_performance_ranking(10),
+        'Niche Analysis': analyzer.niche_analysis,
+        'Duration Analysis': analyzer.duration_analysis,
+        'Top Performing Videos': lambda: analyzer.top_performers_analysis('retention_rate', 10)
+    }
+    with ThreadPoolExecutor(max_workers=len(reports) + 1) as executor:
+        # Also fill the correlation cache used by the insights and visualizations
+        correlations = executor.submit(analyzer.correlation_analysis)
+        futures = {title: executor.submit(report) for title, report in reports.items()}
+        
+        for title, future in futures.items():
+            print(f"\n {title}:")
+            print(future.result())
+        correlations.result()
     
     # Step 3: Generate insights
     print("\n Key Insights:")
@@ -71,23 +107,25 @@ def main():
     # Step 5: Database loading (optional)
     print("\n Step 4: Loading to database (if configured)...")
     if loader.connect_database():
-        if loader.load_to_database():
+        # A reused snapshot leaves the source data unread until it is needed here
+        if (loader.videos is not None or prepare_source_data(loader)) and loader.load_to_database():
             print(" Data loaded to database successfully")
         else:
             print(" Failed to load data to database")
+        loader.close_database()
     else:
         print(" Database connection not available, skipping database load")
     
     # Final summary
     print("\n Analysis Complete!")
     print("=" * 50)
-    summary = loader.get_data_summary()
     print(" Final Summary:")
     for key, value in summary.items():
         print(f"  {key}: {value}")
     
     print("\n Generated Files:")
     print("  - shortform_analysis.png (visualizations)")
+    print("  - merged.parquet (prepared data snapshot)")
     print("  - Database tables (if configured)")
     
     print("\n Next Steps:")